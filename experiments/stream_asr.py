@@ -3,8 +3,8 @@
 stream_asr.py
 
 Capture microphone audio and perform near-real-time speech-to-text
-using faster-whisper with the tiniest Whisper model. Prints recognized
-text to the console as it arrives.
+using faster-whisper with the large-v3-turbo Whisper model. Prints
+recognized text to the console as it arrives.
 
 Usage:
     pip install faster-whisper sounddevice numpy scipy
@@ -12,7 +12,9 @@ Usage:
 
 Press Ctrl+C to stop.
 """
+import os
 import queue
+import signal
 import threading
 import numpy as np
 import sounddevice as sd
@@ -22,26 +24,53 @@ from faster_whisper import WhisperModel
 SAMPLE_RATE   = 16000   # 16 kHz
 CHUNK_SECONDS = 5       # 1-second audio chunks
 CHUNK_SAMPLES = SAMPLE_RATE * CHUNK_SECONDS
+INT16_SCALE   = np.float32(1.0 / 32768.0)
+SILENCE_THRESHOLD_INT16 = 150  # loudest 20 ms frame's mean |amplitude| below this is silence
+FRAME_SAMPLES = SAMPLE_RATE // 50  # 20 ms
+AUDIO_QUEUE_SIZE = 2           # max buffered chunks; oldest dropped when full
+
+# Model settings
+# "auto" lets CTranslate2 pick the fastest type for the device;
+# set WHISPER_COMPUTE_TYPE to override (e.g. "int8" on CPU)
+COMPUTE_TYPE  = os.environ.get("WHISPER_COMPUTE_TYPE", "auto")
 
 
 def main():
-        # Load multilingual Tiny model so it can handle English and Spanish
+    # Load multilingual model so it can handle English and Spanish
     model = WhisperModel(
-        "large-v3",             # multilingual tiny (~75 MB int8)
+        "large-v3-turbo",       # large-v3 accuracy, 4-layer decoder for faster decode
         device="cuda",        # set to "cuda" if your GPU is stable
-        compute_type="float16"   # change to "int8_float16" for GPU or keep "int8" on CPU
+        compute_type=COMPUTE_TYPE,
+        num_workers=1,          # one segment at a time: latency, not throughput
+        cpu_threads=max(1, (os.cpu_count() or 2) // 2)  # physical cores
     )
 
-    audio_queue = queue.Queue()
+    # Preallocated capture slots so the audio callback allocates no data buffer per block;
+    # the pool size also bounds how far we can fall behind the mic
+    slots = np.empty((AUDIO_QUEUE_SIZE, CHUNK_SAMPLES), dtype=np.int16)
+    free_slots = queue.Queue()
+    for i in range(AUDIO_QUEUE_SIZE):
+        free_slots.put(i)
+    audio_queue = queue.Queue()  # (slot, frames)
 
     def audio_callback(indata, frames, time, status):
         if status:
             print(f"Audio status: {status}")
-        audio_queue.put(indata.copy())
+        try:
+            i = free_slots.get_nowait()
+        except queue.Empty:
+            # Drop the oldest chunk and reuse its slot for the newest
+            try:
+                i, _ = audio_queue.get_nowait()
+            except queue.Empty:
+                return
+        frames = min(frames, CHUNK_SAMPLES)
+        slots[i, :frames] = np.frombuffer(indata, dtype=np.int16, count=frames)
+        audio_queue.put_nowait((i, frames))
 
     def record_thread():
         # Continuously read from default microphone
-        with sd.InputStream(
+        with sd.RawInputStream(
             samplerate=SAMPLE_RATE,
             channels=1,
             dtype="int16",
@@ -51,34 +80,53 @@ def main():
             print("Listening (Ctrl+C to stop)…")
             threading.Event().wait()
 
+    # float32 copy of the current segment, reused for every transcription
+    audio = np.empty(CHUNK_SAMPLES, dtype=np.float32)
+    level = np.empty(CHUNK_SAMPLES, dtype=np.int32)  # |x| scratch for the silence gate
+
+    def transcribe_segment(segment):
+        # Skip near-silent segments without invoking Whisper. Gate on the loudest
+        # frame: a whole-segment mean would hide a short word in a quiet segment.
+        np.abs(segment, out=level, dtype=np.int32)  # int32: |-32768| overflows int16
+        if level.reshape(-1, FRAME_SAMPLES).mean(axis=1).max() < SILENCE_THRESHOLD_INT16:
+            return
+
+        # Convert to float32 1D array in [-1.0, +1.0] (fused cast + scale, in place)
+        np.multiply(segment, INT16_SCALE, out=audio)
+
+        try:
+            # Perform transcription; audio is 1D array
+            segments, _ = model.transcribe(
+                audio,
+                beam_size=1,
+                language=None,
+                word_timestamps=False
+            )
+            text = "".join(seg.text for seg in segments).strip()
+            if text:
+                print(f"[RECOGNIZED] {text}")
+        except Exception as e:
+            print(f"Transcription error: {e}")
+
     def process_thread():
-        buffer = np.zeros((0,), dtype=np.int16)
+        # Fixed-size segment filled in place; no per-chunk reallocation
+        segment = np.empty(CHUNK_SAMPLES, dtype=np.int16)
+        filled = 0
         while True:
-            chunk = audio_queue.get()
-            buffer = np.concatenate((buffer, chunk.ravel()))
-            if buffer.shape[0] < CHUNK_SAMPLES:
-                continue
-
-            # Extract a fixed-size segment
-            segment = buffer[:CHUNK_SAMPLES]
-            buffer  = buffer[CHUNK_SAMPLES:]
-
-            # Convert to float32 1D array in [-1.0, +1.0]
-            audio = segment.astype(np.float32) / 32768.0
-
-            try:
-                # Perform transcription; audio is 1D array
-                segments, _ = model.transcribe(
-                    audio,
-                    beam_size=1,
-                    language=None,
-                    word_timestamps=False
-                )
-                text = "".join(seg.text for seg in segments).strip()
-                if text:
-                    print(f"[RECOGNIZED] {text}")
-            except Exception as e:
-                print(f"Transcription error: {e}")
+            slot, frames = audio_queue.get()
+            chunk = slots[slot, :frames]
+            while chunk.size:
+                take = min(chunk.size, CHUNK_SAMPLES - filled)
+                segment[filled:filled + take] = chunk[:take]
+                filled += take
+                chunk = chunk[take:]
+                if not chunk.size:
+                    free_slots.put(slot)  # fully copied out: hand it back before Whisper runs
+                if filled < CHUNK_SAMPLES:
+                    continue
+
+                filled = 0
+                transcribe_segment(segment)
 
     # Launch threads
     recorder = threading.Thread(target=record_thread, daemon=True)
@@ -88,7 +136,10 @@ def main():
 
     try:
         while True:
-            threading.Event().wait(1)
+            if hasattr(signal, "pause"):
+                signal.pause()             # POSIX: sleep until Ctrl+C, no periodic wake-ups
+            else:
+                threading.Event().wait(1)  # Windows: lock waits can't be interrupted by Ctrl+C
     except KeyboardInterrupt:
         print("\nStopping… goodbye!")
 
@@ -6,34 +6,40 @@ A simple REPL CLI tool that prompts the user to enter text in English or Spanish
 then outputs both the English and Spanish versions for each input.
 
 Usage:
-    pip install argostranslate langdetect
+    pip install argostranslate lingua-language-detector
     python translate_text.py
 
 Type 'exit' or press Ctrl+C to quit.
 """
 import sys
+from functools import lru_cache
 import argostranslate.package
 import argostranslate.translate
-from langdetect import detect, DetectorFactory
+from lingua import Language, LanguageDetectorBuilder
 
-# Make language detection deterministic
-DetectorFactory.seed = 0
+# Only English and Spanish are ever expected, which keeps detection fast
+LANG_DETECTOR = LanguageDetectorBuilder.from_languages(
+    Language.ENGLISH, Language.SPANISH
+).build()
 
 def ensure_argos_models():
     """Install English<->Spanish models if not already present."""
-    # Refresh available package index
-    argostranslate.package.update_package_index()
-
     # Determine installed language pairs
     installed_pairs = {
         (pkg.from_code, pkg.to_code)
         for pkg in argostranslate.package.get_installed_packages()
     }
+    missing_pairs = {("en", "es"), ("es", "en")} - installed_pairs
+    if not missing_pairs:
+        return
+
+    # Refresh available package index
+    argostranslate.package.update_package_index()
 
     # Install en->es and es->en if missing
     for pkg in argostranslate.package.get_available_packages():
         pair = (pkg.from_code, pkg.to_code)
-        if pair in (("en", "es"), ("es", "en")) and pair not in installed_pairs:
+        if pair in missing_pairs:
             print(f"Installing model {pair[0]}->{pair[1]}…", file=sys.stderr)
             path = pkg.download()
             argostranslate.package.install_from_path(path)
@@ -51,12 +57,17 @@ def load_translators():
     )
 
 
+@lru_cache(maxsize=1024)
+def detect_lang(text):
+    """Detect the language of text ("en" or "es"), memoized."""
+    if LANG_DETECTOR.detect_language_of(text) == Language.SPANISH:
+        return "es"
+    return "en"
+
+
 def translate_text(text, en_to_es, es_to_en):
     """Detect language of input text and print both English and Spanish."""
-    try:
-        lang = detect(text)
-    except Exception:
-        lang = "en"
+    lang = detect_lang(text)
 
     if lang.startswith("es"):
         spanish = text
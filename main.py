@@ -1,18 +1,28 @@
 # ── CONFIG ────────────────────────────────────────────────────────────────── #
-MODEL_NAME        = "large-v3"      # Whisper checkpoint to load.
+MODEL_NAME        = "large-v3-turbo" # Whisper checkpoint to load.
                                    #   "small"  – fastest, lowest VRAM, lower accuracy
                                    #   "medium" – good balance for live captions on a mid‑tier GPU
                                    #   "large-v3" – highest accuracy, 2‑3× slower, needs 10‑12 GB VRAM
+                                   #   "large-v3-turbo" – large-v3 encoder with a 4‑layer decoder: near large-v3
+                                   #                      accuracy at a fraction of the decode time (default)
+                                   #   ("distil-large-v3" is English‑only, so it can’t caption Spanish)
                                    # Pick smaller if latency > 1 s or GPU memory is tight.
 
 DEVICE            = "cuda"        # "cuda" to run on an NVIDIA GPU (fastest)
                                    # "cpu"  if you have no CUDA device. Expect ~5× slower unless
                                    #         you also down‑size MODEL_NAME to "small" or "tiny".
 
-COMPUTE_TYPE      = "float16"     # Math precision / quantization mode:
-                                   #   "float16"        – fastest on most GPUs, full accuracy
-                                   #   "int8_float16"   – 20‑30 % smaller/faster, tiny accuracy hit
+COMPUTE_TYPE      = "auto"        # Math precision / quantization mode (env WHISPER_COMPUTE_TYPE overrides):
+                                   #   "auto"           – let CTranslate2 pick the fastest type the device
+                                   #                      supports (INT8/FP16 on GPU, INT8 on VNNI CPUs)
+                                   #   "int8_float16"   – INT8 weights, FP16 activations: ~½ VRAM and
+                                   #                      faster decode, tiny accuracy hit
+                                   #   "float16"        – full accuracy, 2× the weight bandwidth
                                    #   "int8"           – smallest, safest for CPU‑only but slowest on GPU
+                                   # CTranslate2 quantizes the checkpoint on load. To skip that, convert once:
+                                   #   ct2-transformers-converter --model openai/whisper-large-v3-turbo \
+                                   #     --quantization int8_float16 --output_dir models/whisper-large-v3-turbo-int8f16
+                                   # and point MODEL_NAME at that directory.
 
 SAMPLE_RATE       = 16000         # Microphone sampling rate. Whisper is trained at 16 kHz;
                                    # change only if your mic refuses 16 kHz (rare).
@@ -25,8 +35,15 @@ HOP_SECONDS       = 2             # Slide (hop) size: new audio fed each iterati
                                    # Lower hop → quicker on‑screen updates.
                                    # Must be < WINDOW_SECONDS. Typical: 1–2 s.
 
-BEAM_SIZE         = 3             # Beam‑search width (1 = greedy decode).
-                                   # Increasing to 2–3 can rescue tricky words but ~2× slower.
+AUDIO_QUEUE_SIZE  = 2             # Max mic chunks buffered for Whisper. When full the oldest chunk
+                                   # is dropped, so captions stay on live audio instead of drifting
+                                   # further behind.
+
+STAGE_QUEUE_SIZE  = 4             # Max results waiting between the ASR → translation → print stages.
+                                   # When full, the earlier stage blocks instead of piling up output.
+
+BEAM_SIZE         = 1             # Beam‑search width (1 = greedy decode).
+                                   # Greedy for live captions; 2–3 can rescue tricky words but ~2× slower.
 
 TEMPERATURE_LIST  = [0.0]         # List of decoding temperatures Whisper cycles through.
                                    # Leave as [0.0] for lowest latency.
@@ -36,35 +53,74 @@ COMP_RATIO_THRES  = 2.4           # If output text is “too compressible” (li
                                    # Whisper re‑decodes at higher temperature.
                                    # Lower value = stricter (safer, slower); higher = trust first pass.
 
-NO_SPEECH_THRES   = 0.6           # Probability threshold for treating a segment as silence.
+NO_SPEECH_THRES   = 0.7           # Probability threshold for treating a segment as silence.
                                    # Raise to 0.7–0.8 if blanks appear too often.
                                    # Lower to 0.4 if short speech fragments are missed.
+
+SILENCE_THRESHOLD_INT16 = 150     # Mean |amplitude| (int16 units) of the loudest 20 ms frame below which
+                                   # a window is treated as silence and Whisper is not called at all.
+                                   # Raise for noisy rooms, lower (or 0 to disable) if quiet speakers
+                                   # get skipped.
+
+MIN_DETECT_CHARS  = 6             # Transcript updates shorter than this (“yes”, “okay”) are too short
+                                   # to classify reliably; they reuse the last detected language.
+
+VAD_PARAMETERS    = {             # Silero VAD drops silence before the encoder runs;
+    "min_silence_duration_ms": 500,   #   silent windows then cost only the VAD pass, no GPU decode.
+    "speech_pad_ms": 200,             #   Raise "threshold" (0–1) if noise is mistaken for speech,
+    "threshold": 0.5,                 #   raise "speech_pad_ms" if word edges get clipped.
+}
 # ───────────────────────────────────────────────────────────────────────────── #
 
 
-import queue, threading, sys
+import os, queue, signal, threading, sys
+from itertools import count
+from functools import lru_cache
+
+# Run Argos MT on Whisper's device. argostranslate reads ARGOS_DEVICE_TYPE once at
+# import, so it must be set first; it has no compute‑type setting of its own.
+os.environ.setdefault("ARGOS_DEVICE_TYPE", "cuda" if DEVICE == "cuda" else "cpu")
+
+# One transcription at a time: give it the physical cores (assuming 2‑way SMT),
+# so CPU inference doesn't oversubscribe OpenMP threads.
+CPU_THREADS = max(1, (os.cpu_count() or 2) // 2)
+if DEVICE == "cpu":
+    os.environ.setdefault("OMP_NUM_THREADS", str(CPU_THREADS))
 
 import numpy as np
 import sounddevice as sd
 from faster_whisper import WhisperModel
+from faster_whisper.vad import VadOptions, get_speech_timestamps
 import argostranslate.package as argpkg
 import argostranslate.translate as argtrans
-from langdetect import detect, DetectorFactory
+from lingua import Language, LanguageDetectorBuilder
 from colorama import init as colorama_init, Fore, Style
 
-DetectorFactory.seed = 0
+from stream_utils import peak_frame_level, ring_write, unseen_words
+
+# Compiled detector limited to the two languages we translate between;
+# models are preloaded so the first transcript doesn't pay for loading them.
+LANG_DETECTOR = (LanguageDetectorBuilder
+                 .from_languages(Language.ENGLISH, Language.SPANISH)
+                 .with_preloaded_language_models()
+                 .build())
 colorama_init(autoreset=True)
 
 WINDOW_SAMPS = int(SAMPLE_RATE * WINDOW_SECONDS)
 HOP_SAMPS    = int(SAMPLE_RATE * HOP_SECONDS)
+INT16_SCALE  = np.float32(1.0 / 32768.0)
+GATE_FRAME   = SAMPLE_RATE // 50  # 20 ms frames for the silence gate
 
 # ── translation helpers ───────────────────────────────────────────────────── #
 def ensure_argos_models():
-    argpkg.update_package_index()
     installed = {(p.from_code, p.to_code) for p in argpkg.get_installed_packages()}
+    missing = {("en", "es"), ("es", "en")} - installed
+    if not missing:
+        return  # skip the network index refresh on every start
+    argpkg.update_package_index()
     for p in argpkg.get_available_packages():
         pair = (p.from_code, p.to_code)
-        if pair in {("en", "es"), ("es", "en")} and pair not in installed:
+        if pair in missing:
             print(f"Downloading Argos model {pair[0]}→{pair[1]} …", file=sys.stderr)
             argpkg.install_from_path(p.download())
 
@@ -73,11 +129,13 @@ def load_translators():
     en, es = (next(l for l in langs if l.code == c) for c in ("en", "es"))
     return en.get_translation(es), es.get_translation(en)
 
-def translate_pair(text, en_to_es, es_to_en):
-    try:
-        src = detect(text)
-    except Exception:
-        src = "en"
+@lru_cache(maxsize=1024)  # overlapping windows re‑emit the same text
+def detect_lang(text):
+    if LANG_DETECTOR.detect_language_of(text) == Language.SPANISH:
+        return "es"
+    return "en"
+
+def translate_pair(text, src, en_to_es, es_to_en):
     if src.startswith("es"):
         return es_to_en.translate(text), text
     return text, en_to_es.translate(text)
@@ -85,64 +143,159 @@ def translate_pair(text, en_to_es, es_to_en):
 
 def main():
     # Whisper
-    model = WhisperModel(MODEL_NAME, device=DEVICE, compute_type=COMPUTE_TYPE)
-    model.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32))  # GPU warm‑up
+    compute_type = os.environ.get("WHISPER_COMPUTE_TYPE", COMPUTE_TYPE)
+    model = WhisperModel(MODEL_NAME, device=DEVICE, compute_type=compute_type,
+                         num_workers=1, cpu_threads=CPU_THREADS)
+    # GPU warm‑up. transcribe() is lazy: the encoder and decoder only run once the
+    # segments are drained. Any input length works, since every segment is padded to
+    # 30 s of mel frames. language=None also warms the detection pass used at runtime.
+    for _ in range(2):
+        segs, _ = model.transcribe(np.zeros(WINDOW_SAMPS, dtype=np.float32),
+                                   beam_size=BEAM_SIZE, language=None)
+        list(segs)
 
     # Argos
     ensure_argos_models()
     en_to_es, es_to_en = load_translators()
 
-    audio_q = queue.Queue()
+    # The PortAudio callback copies into preallocated slots and passes slot indices
+    # (not fresh arrays) to Whisper, so no audio data buffer is allocated per block.
+    # (It still creates a few small Python objects: the frombuffer view and the tuple.)
+    slots   = np.empty((AUDIO_QUEUE_SIZE, HOP_SAMPS), dtype=np.int16)
+    free_q  = queue.Queue()       # slot indices ready to be filled
+    audio_q = queue.Queue()       # (slot, frames, seq) waiting for Whisper; ≤ AUDIO_QUEUE_SIZE
+    for i in range(AUDIO_QUEUE_SIZE):
+        free_q.put(i)
+    # Every captured block gets the next number, queued or not, so a dropped
+    # block shows up to the consumer as a skipped seq on the chunk after it.
+    block_seq = count()
 
     def audio_cb(indata, frames, t, status):
         if status:
             print(f"Audio status: {status}", file=sys.stderr)
-        audio_q.put(indata.copy())
+        seq = next(block_seq)
+        try:
+            i = free_q.get_nowait()
+        except queue.Empty:
+            # Whisper is behind: recycle the oldest chunk's slot so we stay on live audio
+            try:
+                i, _, _ = audio_q.get_nowait()
+            except queue.Empty:
+                return  # the only slot is being read; drop this block
+        frames = min(frames, HOP_SAMPS)
+        slots[i, :frames] = np.frombuffer(indata, dtype=np.int16, count=frames)
+        audio_q.put_nowait((i, frames, seq))
+
+    asr_out_q = queue.Queue(maxsize=STAGE_QUEUE_SIZE)  # transcripts → translator
+    mt_out_q  = queue.Queue(maxsize=STAGE_QUEUE_SIZE)  # (text, eng, spa) → printer
 
     def record_loop():
-        with sd.InputStream(samplerate=SAMPLE_RATE,
-                            channels=1,
-                            dtype="int16",
-                            blocksize=HOP_SAMPS,
-                            callback=audio_cb):
+        with sd.RawInputStream(samplerate=SAMPLE_RATE,
+                               channels=1,
+                               dtype="int16",
+                               blocksize=HOP_SAMPS,
+                               callback=audio_cb):
             print("Listening … (Ctrl+C to stop)")
             threading.Event().wait()
 
+    vad_options = VadOptions(**VAD_PARAMETERS)
+    speech_f32  = np.empty(WINDOW_SAMPS, dtype=np.float32)  # VAD‑kept audio, reused every hop
+
+    def transcribe_window(audio_f32, prompt):
+        # Run the (CPU) VAD first: with language=None, transcribe() would run a
+        # language‑detection encoder pass on the GPU even when VAD leaves nothing.
+        # The speech it keeps is packed here, as vad_filter would, so VAD runs once.
+        n = 0
+        for ts in get_speech_timestamps(audio_f32, vad_options):
+            k = ts["end"] - ts["start"]
+            speech_f32[n:n + k] = audio_f32[ts["start"]:ts["end"]]
+            n += k
+        if not n:
+            return ""
+        segs, _ = model.transcribe(
+            speech_f32[:n],
+            beam_size=BEAM_SIZE,
+            temperature=TEMPERATURE_LIST,
+            compression_ratio_threshold=COMP_RATIO_THRES,
+            no_speech_threshold=NO_SPEECH_THRES,
+            # Context comes from the previous window's text via initial_prompt instead
+            condition_on_previous_text=False,
+            initial_prompt=prompt,
+            language=None,
+            vad_filter=False  # already applied above
+        )
+        return "".join(s.text for s in segs).strip()
+
     def process_loop():
-        buf = np.zeros((0,), dtype=np.int16)
+        ring = np.zeros(2 * WINDOW_SAMPS, dtype=np.int16)
+        pos = filled = pending = 0
+        last_seq = -1
+        audio_f32 = np.empty(WINDOW_SAMPS, dtype=np.float32)  # reused every hop
+        level     = np.empty(WINDOW_SAMPS, dtype=np.int32)    # |x| scratch for the gate
+        last_text = ""
+        while True:
+            # Drain every queued chunk into the ring. If Whisper fell behind, only the
+            # newest window is worth transcribing: each skipped one lies inside the
+            # window before it plus this one, so it would add no new audio.
+            slot, frames, seq = audio_q.get()
+            while True:
+                if seq != last_seq + 1:  # audio gap: refill rather than splice stale samples
+                    filled = pending = 0
+                last_seq = seq
+                pos = ring_write(ring, pos, slots[slot, :frames])
+                free_q.put(slot)  # copied into the ring: hand the slot back
+                filled = min(filled + frames, WINDOW_SAMPS)
+                pending += frames
+                try:
+                    slot, frames, seq = audio_q.get_nowait()
+                except queue.Empty:
+                    break
+            if filled < WINDOW_SAMPS or pending < HOP_SAMPS:
+                continue
+            pending = 0  # slide forward by hop length
+            window = ring[pos:pos + WINDOW_SAMPS]  # newest WINDOW_SAMPS samples
+            if peak_frame_level(window, level, GATE_FRAME) < SILENCE_THRESHOLD_INT16:
+                continue  # too quiet to be speech – skip Whisper entirely
+
+            np.multiply(window, INT16_SCALE, out=audio_f32)  # fused cast + scale
+            text = transcribe_window(audio_f32, last_text or None)
+            if not text:
+                continue
+            tail = unseen_words(last_text.split(), text.split())
+            last_text = text
+            if tail:
+                asr_out_q.put(" ".join(tail))
+
+    # ASR → MT → printer run as separate stages, so the next window is being
+    # transcribed while the previous one is translated and printed.
+    def translate_loop():
+        last_lang = "en"  # until a long enough transcript has been seen
         while True:
-            buf = np.concatenate((buf, audio_q.get().ravel()))
-            while buf.size >= WINDOW_SAMPS:
-                window = buf[:WINDOW_SAMPS]
-                buf = buf[HOP_SAMPS:]  # slide forward by hop length
-
-                audio_f32 = window.astype(np.float32) / 32768.0
-                segs, _ = model.transcribe(
-                    audio_f32,
-                    beam_size=BEAM_SIZE,
-                    temperature=TEMPERATURE_LIST,
-                    compression_ratio_threshold=COMP_RATIO_THRES,
-                    no_speech_threshold=NO_SPEECH_THRES,
-                    condition_on_previous_text=True,
-                    language=None
-                )
-                text = "".join(s.text for s in segs).strip()
-                if not text:
-                    continue
-
-                eng, spa = translate_pair(text, en_to_es, es_to_en)
-
-                print(Fore.CYAN + Style.BRIGHT + f"> {text}")
-                print(Fore.GREEN   + f"↳ English: {eng}")
-                print(Fore.MAGENTA + f"↳ Español: {spa}")
-                print(Style.DIM + "-" * 50)
-
-    threading.Thread(target=record_loop,  daemon=True).start()
-    threading.Thread(target=process_loop, daemon=True).start()
+            text = asr_out_q.get()
+            if len(text) >= MIN_DETECT_CHARS:
+                last_lang = detect_lang(text)
+            eng, spa = translate_pair(text, last_lang, en_to_es, es_to_en)
+            mt_out_q.put((text, eng, spa))
+
+    def print_loop():
+        while True:
+            text, eng, spa = mt_out_q.get()
+            print(Fore.CYAN + Style.BRIGHT + f"> {text}")
+            print(Fore.GREEN   + f"↳ English: {eng}")
+            print(Fore.MAGENTA + f"↳ Español: {spa}")
+            print(Style.DIM + "-" * 50)
+
+    threading.Thread(target=record_loop,    daemon=True).start()
+    threading.Thread(target=process_loop,   daemon=True).start()
+    threading.Thread(target=translate_loop, daemon=True).start()
+    threading.Thread(target=print_loop,     daemon=True).start()
 
     try:
         while True:
-            threading.Event().wait(1)
+            if hasattr(signal, "pause"):
+                signal.pause()             # POSIX: sleep until Ctrl+C, no periodic wake‑ups
+            else:
+                threading.Event().wait(1)  # Windows: lock waits can't be interrupted by Ctrl+C
     except KeyboardInterrupt:
         print("\nStopping … adiós!")
 
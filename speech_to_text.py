@@ -1,7 +1,7 @@
 # Model configuration
-MODEL_NAME = "large-v3"
+MODEL_NAME = "large-v3-turbo"  # large-v3 encoder, 4-layer decoder; much faster decode
 DEVICE = "cuda"
-COMPUTE_TYPE = "float16"
+COMPUTE_TYPE = "auto"  # fastest type for the device; env WHISPER_COMPUTE_TYPE overrides
 
 # Audio processing settings
 SAMPLE_RATE = 16000
@@ -10,82 +10,141 @@ SAMPLE_RATE = 16000
 WINDOW_SECONDS = 10
 HOP_SECONDS = 1
 
-import queue, threading, sys
+# Max mic chunks buffered for Whisper; the oldest is dropped when full
+AUDIO_QUEUE_SIZE = 2
+
+# Mean |amplitude| (int16 units) of the loudest 20 ms frame below which a window
+# is skipped as silence
+SILENCE_THRESHOLD_INT16 = 150
+
+import os, queue, signal, threading, sys
+from itertools import count
+
+# One transcription at a time: give it the physical cores (assuming 2-way SMT)
+CPU_THREADS = max(1, (os.cpu_count() or 2) // 2)
+if DEVICE == "cpu":
+    os.environ.setdefault("OMP_NUM_THREADS", str(CPU_THREADS))
 
 import numpy as np
 import sounddevice as sd
 from faster_whisper import WhisperModel
 from colorama import init as colorama_init, Fore, Style
 
+from stream_utils import peak_frame_level, ring_write
+
 colorama_init(autoreset=True)
 
 WINDOW_SAMPLES = int(SAMPLE_RATE * WINDOW_SECONDS)
 HOP_SAMPLES    = int(SAMPLE_RATE * HOP_SECONDS)
+INT16_SCALE    = np.float32(1.0 / 32768.0)
+GATE_FRAME     = SAMPLE_RATE // 50  # 20 ms frames for the silence gate
 
 def main():
     # Whisper
-    model = WhisperModel(MODEL_NAME, device=DEVICE, compute_type=COMPUTE_TYPE)
-    model.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32))  # GPU warm‑up
-
-    audio_q = queue.Queue()
+    compute_type = os.environ.get("WHISPER_COMPUTE_TYPE", COMPUTE_TYPE)
+    model = WhisperModel(MODEL_NAME, device=DEVICE, compute_type=compute_type,
+                         num_workers=1, cpu_threads=CPU_THREADS)
+    # GPU warm‑up; segments are lazy, so drain them or nothing runs. language=None
+    # also warms the language‑detection pass used at runtime.
+    for _ in range(2):
+        segs, _ = model.transcribe(np.zeros(WINDOW_SAMPLES, dtype=np.float32), language=None)
+        list(segs)
+
+    # Preallocated capture slots: the callback passes slot indices, not new arrays
+    slots   = np.empty((AUDIO_QUEUE_SIZE, HOP_SAMPLES), dtype=np.int16)
+    free_q  = queue.Queue()       # slot indices ready to be filled
+    audio_q = queue.Queue()       # (slot, frames, seq) waiting for Whisper
+    for i in range(AUDIO_QUEUE_SIZE):
+        free_q.put(i)
+    # Every captured block is numbered, queued or not: a skipped seq marks a gap
+    block_seq = count()
 
     def audio_cb(indata, frames, t, status):
         if status:
             print(f"Audio status: {status}", file=sys.stderr)
-        audio_q.put(indata.copy())
+        seq = next(block_seq)
+        try:
+            i = free_q.get_nowait()
+        except queue.Empty:
+            # Whisper is behind: recycle the oldest chunk's slot so we stay on live audio
+            try:
+                i, _, _ = audio_q.get_nowait()
+            except queue.Empty:
+                return  # the only slot is being read; drop this block
+        frames = min(frames, HOP_SAMPLES)
+        slots[i, :frames] = np.frombuffer(indata, dtype=np.int16, count=frames)
+        audio_q.put_nowait((i, frames, seq))
 
     def record_loop():
-        with sd.InputStream(samplerate=SAMPLE_RATE,
-                            channels=1,
-                            dtype="int16",
-                            blocksize=HOP_SAMPLES,
-                            callback=audio_cb):
+        with sd.RawInputStream(samplerate=SAMPLE_RATE,
+                               channels=1,
+                               dtype="int16",
+                               blocksize=HOP_SAMPLES,
+                               callback=audio_cb):
             print("Listening … (Ctrl+C to stop)")
             threading.Event().wait()
 
     def process_loop():
-        buf = np.zeros((0,), dtype=np.int16)
+        ring = np.zeros(2 * WINDOW_SAMPLES, dtype=np.int16)
+        pos = filled = pending = 0
+        last_seq = -1
+        audio_f32 = np.empty(WINDOW_SAMPLES, dtype=np.float32)  # reused every hop
+        level     = np.empty(WINDOW_SAMPLES, dtype=np.int32)    # |x| scratch for the gate
         while True:
-            # 1) append the new 1 s chunk
-            buf = np.concatenate((buf, audio_q.get().ravel()))
-
-            # 2) once we have at least 10 s, run Whisper
-            while buf.size >= WINDOW_SAMPLES:
-                # 2a) grab the newest 10 s
-                window = buf[-WINDOW_SAMPLES:]
-
-                # 2b) slide forward by dropping the oldest 1 s
-                buf = buf[HOP_SAMPLES:]
-
-                # 3) transcribe that window
-                audio_f32 = window.astype(np.float32) / 32768.0
-                segs, _ = model.transcribe(
-                    audio_f32,
-                    vad_filter=True,
-                    # vad_parameters={
-                    #     # only keep segments ≥ 300 ms speech
-                    #     "min_speech_duration_ms": 300,
-                    #     # require ≥ 500 ms silence to break
-                    #     "min_silence_duration_ms": 500,
-                    #     # pad each segment by 400 ms of audio
-                    #     "speech_pad_ms": 400,
-                    #     # threshold for speech vs silence (0–1)
-                    #     "threshold": 0.5
-                    # }
-                )
-                text = "".join(s.text for s in segs).strip()
-                if not text:
-                    continue
-
-                print(Fore.CYAN + Style.BRIGHT + f"> {text}")
-                print(Style.DIM + "-" * 50)
+            # 1) append the new 1 s chunk (after an audio gap, start a fresh window)
+            slot, frames, seq = audio_q.get()
+            if seq != last_seq + 1:
+                filled = pending = 0
+            last_seq = seq
+            pos = ring_write(ring, pos, slots[slot, :frames])
+            free_q.put(slot)  # copied into the ring: hand the slot back
+            filled = min(filled + frames, WINDOW_SAMPLES)
+            pending += frames
+
+            # 2) once we have at least 10 s, run Whisper once per hop
+            if filled < WINDOW_SAMPLES or pending < HOP_SAMPLES:
+                continue
+            pending = 0
+
+            # 2a) grab the newest 10 s (contiguous view, no copy)
+            window = ring[pos:pos + WINDOW_SAMPLES]
+
+            # 2b) skip near-silent windows before paying for the encoder
+            if peak_frame_level(window, level, GATE_FRAME) < SILENCE_THRESHOLD_INT16:
+                continue
+
+            # 3) transcribe that window
+            np.multiply(window, INT16_SCALE, out=audio_f32)  # fused cast + scale
+            segs, _ = model.transcribe(
+                audio_f32,
+                vad_filter=True,
+                # vad_parameters={
+                #     # only keep segments ≥ 300 ms speech
+                #     "min_speech_duration_ms": 300,
+                #     # require ≥ 500 ms silence to break
+                #     "min_silence_duration_ms": 500,
+                #     # pad each segment by 400 ms of audio
+                #     "speech_pad_ms": 400,
+                #     # threshold for speech vs silence (0–1)
+                #     "threshold": 0.5
+                # }
+            )
+            text = "".join(s.text for s in segs).strip()
+            if not text:
+                continue
+
+            print(Fore.CYAN + Style.BRIGHT + f"> {text}")
+            print(Style.DIM + "-" * 50)
 
     threading.Thread(target=record_loop,  daemon=True).start()
     threading.Thread(target=process_loop, daemon=True).start()
 
     try:
         while True:
-            threading.Event().wait(1)
+            if hasattr(signal, "pause"):
+                signal.pause()             # POSIX: sleep until Ctrl+C, no periodic wake‑ups
+            else:
+                threading.Event().wait(1)  # Windows: lock waits can't be interrupted by Ctrl+C
     except KeyboardInterrupt:
         print("\nStopping … adiós!")
 
@@ -0,0 +1,43 @@
+# Pure helpers shared by main.py and speech_to_text.py. Kept free of the audio,
+# Whisper and Argos imports (numpy only) so they can be imported (and tested) on any box.
+
+import string
+
+import numpy as np
+
+# Edge punctuation Whisper adds or drops between windows, incl. Spanish ¿ ¡ and curly quotes
+_EDGE_PUNCT = string.punctuation + "¿¡“”‘’«»…"
+
+def _norm(word):
+    return word.strip(_EDGE_PUNCT).casefold()
+
+def unseen_words(prev, words):
+    # Overlapping windows re‑emit what was already shown, shifted left as old audio
+    # slides out. Drop the longest run that ends `prev` and starts `words`; the rest
+    # is new. Whole words, so a grown word ("want" → "wanted") is never split.
+    # Words are compared casefolded and without edge punctuation, since the window
+    # edge often turns "store." into "store" or "to" into "To"; output keeps `words`.
+    p = [_norm(w) for w in prev]
+    q = [_norm(w) for w in words]
+    for k in range(min(len(p), len(q)), 0, -1):
+        if p[-k:] == q[:k]:
+            return words[k:]
+    return words
+
+def ring_write(ring, pos, chunk):
+    # `ring` is 2×WINDOW long and every sample is stored at i and i + WINDOW, so the
+    # newest window is always the contiguous view ring[pos:pos + WINDOW] – no copy.
+    n = ring.size // 2
+    head = min(chunk.size, n - pos)
+    for off in (0, n):
+        ring[off + pos:off + pos + head] = chunk[:head]
+        ring[off:off + chunk.size - head] = chunk[head:]
+    return (pos + chunk.size) % n
+
+def peak_frame_level(window, scratch, frame):
+    # Mean |amplitude| of the loudest `frame`‑sample frame. A whole‑window mean
+    # dilutes a short word in mostly quiet audio below any usable threshold.
+    # |x| goes into the preallocated int32 `scratch` (int16 |−32768| overflows).
+    np.abs(window, out=scratch, dtype=np.int32)
+    usable = scratch.size - scratch.size % frame
+    return scratch[:usable].reshape(-1, frame).sum(axis=1).max() / frame
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from stream_utils import peak_frame_level, ring_write, unseen_words
+
+
+def test_unseen_words_first_window():
+    assert unseen_words([], "hello there".split()) == ["hello", "there"]
+
+
+def test_unseen_words_sliding_window():
+    prev = "the quick brown fox jumps over".split()
+    words = "brown fox jumps over the lazy dog".split()
+    assert unseen_words(prev, words) == ["the", "lazy", "dog"]
+
+
+def test_unseen_words_tail_already_shown():
+    assert unseen_words("a b c d e f".split(), "c d e f".split()) == []
+    assert unseen_words("c d e f".split(), "e f".split()) == []
+
+
+def test_unseen_words_no_overlap():
+    assert unseen_words("a b".split(), "c d".split()) == ["c", "d"]
+
+
+def test_unseen_words_ignores_edge_punctuation():
+    prev = "I went to the store.".split()
+    assert unseen_words(prev, "to the store and then".split()) == ["and", "then"]
+
+
+def test_unseen_words_ignores_case():
+    prev = "I went to the store".split()
+    assert unseen_words(prev, "To the store and then".split()) == ["and", "then"]
+
+
+def test_unseen_words_keeps_original_tokens():
+    prev = "¿Dónde está".split()
+    assert unseen_words(prev, "dónde está el Baño?".split()) == ["el", "Baño?"]
+
+
+@pytest.mark.parametrize("chunk", [1, 3, 4, 7, 10])
+def test_ring_write_window_is_last_samples(chunk):
+    # Chunk sizes that divide the window, straddle its end, or equal it
+    window = 10
+    ring = np.zeros(2 * window, dtype=np.int16)
+    pos = 0
+    stream = np.arange(1, 100, dtype=np.int16)
+    for end in range(chunk, stream.size, chunk):
+        pos = ring_write(ring, pos, stream[end - chunk:end])
+        expected = np.zeros(window, dtype=np.int16)
+        tail = stream[max(0, end - window):end]
+        expected[window - tail.size:] = tail
+        np.testing.assert_array_equal(ring[pos:pos + window], expected)
+
+
+def test_peak_frame_level_finds_short_word():
+    # 1 s of speech at |x| ≈ 600 in 8 s of background at ≈ 30: the
+    # whole-window mean is ~101, but the loudest frame still reads 600
+    window = np.full(8 * 16000, 30, dtype=np.int16)
+    window[16000:32000] = -600
+    scratch = np.empty(window.size, dtype=np.int32)
+    assert peak_frame_level(window, scratch, 320) == 600
+
+
+def test_peak_frame_level_int16_min():
+    window = np.full(320, -32768, dtype=np.int16)
+    scratch = np.empty(window.size, dtype=np.int32)
+    assert peak_frame_level(window, scratch, 320) == 32768